@@ -8,105 +8,202 @@ This script parses the HTML rules file and converts each major section
 
 import re
 from pathlib import Path
-from bs4 import BeautifulSoup, NavigableString, Tag
-from typing import List, Optional, Dict
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+from typing import List, Optional, Dict, Sequence, Set, Tuple
+
+
+# Pre-compiled patterns (these are hit for every node in the tree)
+_WS_RE = re.compile(r'\s+')
+_DISPLAY_NONE_RE = re.compile(r'display\s*:\s*none', re.IGNORECASE)
+_RULE_REF_RE = re.compile(r'([+-]?\d+\.\d+(?:\.\d+)*)')
+_FIX_100_RE = re.compile(r'^1\.00\.\d+')
+# Intro phrasing of an unanchored first list item; the lookaheads match
+# words that may appear in any order
+_INTRO_RE = re.compile(
+    r'this section|lists all'
+    r'|^(?=.*play at)(?=.*anytime)(?=.*(?:options|one of these))'
+    r'|^(?=.*on your)(?=.*action)(?=.*adhere)'
+    r'|^play at anytime',
+    re.DOTALL
+)
+
+# Section id keyword -> section number, for sections without data-listindex
+SECTION_MAP = {
+    'setupgame': '0',
+    'phases': '1',
+    'factions': '2',
+    'treachery': '3',
+    'variants': '4'
+}
+_SECTION_RE = re.compile('|'.join(map(re.escape, SECTION_MAP)))
 
 
 def clean_text(text: str) -> str:
     """Clean text by removing extra whitespace."""
     if not text:
         return ""
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     return text.strip()
 
 
+# Ids of elements carrying an inline display: none, plus memoized is_hidden()
+# results. Only valid inside process_section(), which builds them for its
+# section with index_hidden_elements() and clears them via clear_caches().
+_hidden_ids: Set[int] = set()
+_hidden_memo: Dict[int, bool] = {}
+
+
+def index_hidden_elements(root: Tag) -> None:
+    """Record every element with display: none so is_hidden() is a set lookup.
+    
+    Covers root, its descendants and its ancestors, i.e. every element that
+    is_hidden() can be asked about while processing root. Replaces any
+    previous index and clears all per-element caches.
+    """
+    clear_caches()
+    _hidden_ids.update(id(tag) for tag in root.find_all(style=_DISPLAY_NONE_RE))
+    current = root
+    while isinstance(current, Tag):
+        if _DISPLAY_NONE_RE.search(current.get('style') or ''):
+            _hidden_ids.add(id(current))
+        current = current.parent
+
+
 def is_hidden(element) -> bool:
-    """Check if element or any parent has display: none."""
+    """Check if element or any parent has display: none.
+    
+    Relies on index_hidden_elements() having indexed the element's tree;
+    unindexed elements are reported as visible.
+    """
     if not isinstance(element, Tag):
         return False
     
+    hidden = False
+    walked = []
     current = element
-    while current:
-        if isinstance(current, Tag):
-            style = current.get('style', '')
-            # Check for display: none or display:none (with or without space)
-            if 'display' in style.lower() and 'none' in style.lower():
-                # More precise check
-                if re.search(r'display\s*:\s*none', style, re.IGNORECASE):
-                    return True
-        # Navigate to parent
-        current = getattr(current, 'parent', None)
-        # Stop at document root
-        if current is None or current.name == '[document]':
+    while isinstance(current, Tag):
+        key = id(current)
+        cached = _hidden_memo.get(key)
+        if cached is not None:
+            hidden = cached
             break
+        if key in _hidden_ids:
+            hidden = True
+            break
+        walked.append(key)
+        current = current.parent
     
-    return False
+    # Every element on the walked path shares the same answer
+    for key in walked:
+        _hidden_memo[key] = hidden
+    return hidden
+
+
+# Memo of get_text_content() and extract_cross_references(), keyed by
+# element id. Like the hidden index, it only lives for one process_section().
+_text_cache: Dict[Tuple[int, bool], str] = {}
+_xref_cache: Dict[int, str] = {}
+
+
+def clear_caches() -> None:
+    """Drop the hidden index and every id()-keyed cache.
+    
+    Ids can be reused once a tree is garbage collected, so nothing may
+    survive past the section it was built for.
+    """
+    _hidden_ids.clear()
+    _hidden_memo.clear()
+    _text_cache.clear()
+    _xref_cache.clear()
+
+
+def _is_intro_text(text: str) -> bool:
+    """Check if a list item's text reads like intro text ("this section ...")."""
+    return _INTRO_RE.search(text.lower()) is not None
 
 
 def get_text_content(element, skip_links: bool = False, exclude_nested_lists: bool = True) -> str:
-    """Extract text content from element, handling various tags."""
+    """Extract text content from element, handling various tags.
+    
+    Links are always reduced to their text, so skip_links does not change
+    the output and is not part of the cache key.
+    """
     if isinstance(element, NavigableString):
         return str(element)
     
     if not isinstance(element, Tag):
         return ""
     
+    key = (id(element), exclude_nested_lists)
+    text = _text_cache.get(key)
+    if text is None:
+        text = _text_cache[key] = _collect_text(element, exclude_nested_lists)
+    return text
+
+
+def _collect_text(element: Tag, exclude_nested_lists: bool) -> str:
+    """Uncached body of get_text_content() for a Tag.
+    
+    Walks the tree with an explicit stack instead of recursing. Each tag's
+    text is still whitespace-collapsed and stripped on its own before being
+    joined into its parent, exactly as the recursive version did.
+    """
     # Skip hidden elements (check element and all parents)
     if is_hidden(element):
         return ""
     
     # Skip notclassic elements
-    classes = element.get('class', [])
-    if 'notclassic' in classes:
+    if 'notclassic' in (element.get('class') or ()):
         return ""
     
-    text_parts = []
-    
-    for child in element.children:
-        if isinstance(child, NavigableString):
-            text_parts.append(str(child))
-        elif isinstance(child, Tag):
-            # Skip nested lists if requested
-            if exclude_nested_lists and child.name in ['ol', 'ul']:
-                continue
-            
-            if child.name == 'a':
-                if skip_links:
-                    # Just get text, skip the link
-                    text_parts.append(get_text_content(child, skip_links=True, exclude_nested_lists=exclude_nested_lists))
-                else:
-                    # Check if it's a cross-reference link
-                    href = child.get('href', '')
-                    link_classes = child.get('class', [])
-                    if 'addendum_link' in link_classes or 'supersede_link' in link_classes:
-                        # This is a cross-reference, we'll handle it separately
-                        text_parts.append(get_text_content(child, skip_links=True, exclude_nested_lists=exclude_nested_lists))
-                    elif 'rules#' in href:
-                        # Internal link, just get text
-                        text_parts.append(get_text_content(child, skip_links=True, exclude_nested_lists=exclude_nested_lists))
-                    else:
-                        text_parts.append(get_text_content(child, skip_links=True, exclude_nested_lists=exclude_nested_lists))
-            elif child.name == 'p' and 'example' in child.get('class', []):
+    # Each frame: (remaining children, collected parts, parent's parts, slot in parent)
+    stack = [(iter(element.contents), [], None, 0)]
+    while stack:
+        children, text_parts, parent_parts, slot = stack[-1]
+        for child in children:
+            if isinstance(child, NavigableString):
+                text_parts.append(str(child))
+            elif isinstance(child, Tag):
+                # Skip nested lists if requested
+                if exclude_nested_lists and child.name in ('ol', 'ul'):
+                    continue
+                classes = child.get('class') or ()
                 # Skip example paragraphs
-                pass
-            elif child.name in ['b', 'strong', 'i', 'em', 'span']:
-                text_parts.append(get_text_content(child, skip_links=skip_links, exclude_nested_lists=exclude_nested_lists))
-            else:
-                text_parts.append(get_text_content(child, skip_links=skip_links, exclude_nested_lists=exclude_nested_lists))
+                if child.name == 'p' and 'example' in classes:
+                    continue
+                if 'notclassic' in classes or is_hidden(child):
+                    continue
+                # Reserve a slot for the child's text and descend into it
+                text_parts.append('')
+                stack.append((iter(child.contents), [], text_parts, len(text_parts) - 1))
+                break
+        else:
+            stack.pop()
+            text = clean_text(''.join(text_parts))
+            if parent_parts is None:
+                return text
+            parent_parts[slot] = text
     
-    return clean_text(''.join(text_parts))
+    return ""
 
 
 def extract_cross_references(element: Tag) -> str:
     """Extract cross-reference annotations (+X.XX.XX or -X.XX.XX)."""
+    cached = _xref_cache.get(id(element))
+    if cached is not None:
+        return cached
+    
     refs = []
     seen_refs = set()  # Track to avoid duplicates
     
-    for link in element.find_all('a', class_=lambda x: x and ('addendum_link' in x or 'supersede_link' in x)):
+    # Matches exact class tokens only; variants such as "addendum_links"
+    # are not cross-references
+    for link in element.select('a.addendum_link, a.supersede_link'):
         # Skip hidden links (check element and all parents)
         if is_hidden(link):
             continue
-        if 'notclassic' in link.get('class', []):
+        link_classes = link.get('class') or ()
+        if 'notclassic' in link_classes:
             continue
         
         href = link.get('href', '')
@@ -117,118 +214,123 @@ def extract_cross_references(element: Tag) -> str:
         link_text = get_text_content(link, skip_links=True, exclude_nested_lists=True)
         
         # Look for pattern like +2.01.03 or -3.01.11
-        rule_match = re.search(r'([+-]?\d+\.\d+(?:\.\d+)*)', link_text)
+        rule_match = _RULE_REF_RE.search(link_text)
         if rule_match:
             ref = rule_match.group(1)
             # Ensure it has + or - prefix
             if not ref.startswith(('+', '-')):
-                prefix = '+' if 'addendum_link' in link.get('class', []) else '-'
+                prefix = '+' if 'addendum_link' in link_classes else '-'
                 ref = f"{prefix}{ref}"
             # Avoid duplicates
             if ref not in seen_refs:
                 refs.append(ref)
                 seen_refs.add(ref)
     
-    return ' '.join(refs) if refs else ''
+    result = ' '.join(refs) if refs else ''
+    _xref_cache[id(element)] = result
+    return result
+
+
+def list_items(ol: Tag) -> List[Tag]:
+    """Return the direct <li> children of a list."""
+    return [child for child in ol.contents if isinstance(child, Tag) and child.name == 'li']
 
 
 def format_rule_number(section: str, subsection: Optional[str], rule: int, 
-                      subrules: List[int]) -> str:
+                      subrules: Sequence[int]) -> str:
     """Format a rule number like 1.02.03 or 1.06.05.04."""
-    parts = [section]
     if subsection:
-        parts.append(subsection)
-    parts.append(f"{rule:02d}")
+        prefix = f"{section}.{subsection}.{rule:02d}"
+    else:
+        prefix = f"{section}.{rule:02d}"
     # Zero-pad subrules: 1.06.05.01, 1.06.05.02, etc.
-    parts.extend([f"{sr:02d}" for sr in subrules])
-    return '.'.join(parts)
+    # Spell out the common shallow depths to skip building a list
+    depth = len(subrules)
+    if depth == 0:
+        return prefix
+    if depth == 1:
+        return f"{prefix}.{subrules[0]:02d}"
+    if depth == 2:
+        return f"{prefix}.{subrules[0]:02d}.{subrules[1]:02d}"
+    return prefix + ''.join([f".{sr:02d}" for sr in subrules])
 
 
-def process_li(li: Tag, section: str, subsection: Optional[str], 
-               rule_num: int, subrule_path: List[int], 
-               is_intro: bool = False) -> List[str]:
-    """Process a list item and return formatted rule lines."""
-    
-    # Skip hidden items (check element and all parents)
-    if is_hidden(li):
-        return []
-    if 'notclassic' in li.get('class', []):
-        return []
-    
-    lines = []
-    
-    # Determine rule number
+def rule_number_for(section: str, subsection: Optional[str], rule_num: int,
+                    subrule_path: Sequence[int], is_intro: bool) -> Optional[str]:
+    """Return the rule number for a list item, or None for unnumbered intros."""
     # Intro items should be numbered as .00 (whether in subsection or nested)
     if is_intro:
         if subsection:
             if subrule_path:
                 # Nested intro item with subrules: 3.01.11.05.00 (use parent path + 00)
                 # Build number from parent path, ending with 00
-                parts = [section, subsection, f"{rule_num:02d}"]
-                parts.extend([f"{sr:02d}" for sr in subrule_path])
-                parts.append("00")
-                rule_number = '.'.join(parts)
+                return f"{format_rule_number(section, subsection, rule_num, subrule_path)}.00"
             elif rule_num > 0:
                 # Nested intro item at first level: 3.01.11.00
-                rule_number = f"{section}.{subsection}.{rule_num:02d}.00"
+                return f"{section}.{subsection}.{rule_num:02d}.00"
             else:
                 # Subsection intro: 1.07.00
-                rule_number = f"{section}.{subsection}.00"
-        else:
-            # Top-level intro: 0.00
-            if section == "0" and rule_num == 0:
-                rule_number = "0.00"
+                return f"{section}.{subsection}.00"
+        # Top-level intro: 0.00
+        if section == "0" and rule_num == 0:
+            return "0.00"
+        return None
+    return format_rule_number(section, subsection, rule_num, subrule_path)
+
+
+def process_li(li: Tag, section: str, subsection: Optional[str], 
+               rule_num: int, subrule_path: Sequence[int], out: List[str],
+               is_intro: bool = False) -> None:
+    """Process a list item and its nested lists, appending rule lines to out.
+    
+    Nested items are handled with an explicit stack rather than recursion.
+    Children are pushed in reverse so they pop, and print, in document order.
+    Only the item and its subrule path change between levels.
+    """
+    work: List[Tuple[Tag, Tuple[int, ...], bool]] = [(li, tuple(subrule_path), is_intro)]
+    while work:
+        li, subrule_path, is_intro = work.pop()
+        
+        # Skip hidden items (check element and all parents)
+        if is_hidden(li):
+            continue
+        classes = li.get('class') or ()
+        if 'notclassic' in classes:
+            continue
+        
+        rule_number = rule_number_for(section, subsection, rule_num, subrule_path, is_intro)
+        
+        # Get text content - exclude nested lists
+        text = get_text_content(li, skip_links=False, exclude_nested_lists=True)
+        
+        # Get cross-references
+        cross_refs = extract_cross_references(li)
+        if cross_refs:
+            text = f"{text} {cross_refs}"
+        
+        if text:
+            if rule_number:
+                out.append(f"{rule_number} {text}")
             else:
-                rule_number = None
-    elif subsection:
-        if subrule_path:
-            rule_number = format_rule_number(section, subsection, rule_num, subrule_path)
-        else:
-            rule_number = f"{section}.{subsection}.{rule_num:02d}"
-    else:
-        if subrule_path:
-            rule_number = format_rule_number(section, None, rule_num, subrule_path)
-        else:
-            rule_number = f"{section}.{rule_num:02d}"
-    
-    # Get text content - exclude nested lists
-    text = get_text_content(li, skip_links=False, exclude_nested_lists=True)
-    
-    # Get cross-references
-    cross_refs = extract_cross_references(li)
-    if cross_refs:
-        text = f"{text} {cross_refs}"
-    
-    if text:
-        if rule_number:
-            lines.append(f"{rule_number} {text}")
-        else:
-            # Intro items don't get numbered
-            lines.append(text)
-    
-    # Process nested lists
-    nested_ol = li.find('ol', recursive=False)
-    if nested_ol:
-        # Skip if nested list is hidden
-        if is_hidden(nested_ol):
-            return lines
-        nested_items = nested_ol.find_all('li', recursive=False)
+                # Intro items don't get numbered
+                out.append(text)
+        
+        # Process nested lists (skip if the nested list is hidden)
+        nested_ol = li.find('ol', recursive=False)
+        if not nested_ol or is_hidden(nested_ol):
+            continue
+        nested_items = list_items(nested_ol)
+        
         # Check if first item should be skipped (intro text without anchor)
         skip_first_nested = False
         if nested_items:
             first_nested = nested_items[0]
-            first_nested_text = get_text_content(first_nested, skip_links=True, exclude_nested_lists=True).lower()
+            first_nested_text = get_text_content(first_nested, skip_links=True, exclude_nested_lists=True)
             has_anchor = first_nested.find('a', {'name': True}) is not None
-            is_intro_pattern = (
-                'this section' in first_nested_text or 
-                'lists all' in first_nested_text or 
-                ('play at' in first_nested_text and 'anytime' in first_nested_text and ('options' in first_nested_text or 'one of these' in first_nested_text)) or
-                ('on your' in first_nested_text and 'action' in first_nested_text and 'adhere' in first_nested_text) or
-                first_nested_text.startswith('play at anytime')
-            )
-            if not has_anchor and is_intro_pattern:
+            if not has_anchor and _is_intro_text(first_nested_text):
                 skip_first_nested = True
         
+        children = []
         nested_idx = 0
         for idx, nested_li in enumerate(nested_items):
             # Skip hidden nested items
@@ -236,29 +338,35 @@ def process_li(li: Tag, section: str, subsection: Optional[str],
                 continue
             
             if skip_first_nested and idx == 0:
-                # Intro text items should be numbered as .00
-                # Pass the current subrule_path so it becomes 3.01.11.00
-                nested_lines = process_li(
-                    nested_li, section, subsection, rule_num,
-                    subrule_path,  # Don't add [0], let intro logic handle it
-                    is_intro=True  # Mark as intro so it gets .00
-                )
-                lines.extend(nested_lines)
+                # Intro text items keep the current path and are numbered .00
+                # by the intro logic, e.g. 3.01.11.00
+                children.append((nested_li, subrule_path, True))
                 continue
             
             nested_idx += 1
-            nested_lines = process_li(
-                nested_li, section, subsection, rule_num,
-                subrule_path + [nested_idx], 
-                is_intro='intro' in nested_li.get('class', [])
-            )
-            lines.extend(nested_lines)
-    
-    return lines
+            children.append((
+                nested_li,
+                subrule_path + (nested_idx,),
+                'intro' in (nested_li.get('class') or ())
+            ))
+        work.extend(reversed(children))
 
 
 def process_section(section: Tag, section_num: str) -> str:
-    """Process a major section and return markdown."""
+    """Process a major section and return markdown.
+    
+    Builds the hidden-element index for the section and clears it, along
+    with the text caches, before returning.
+    """
+    index_hidden_elements(section)
+    try:
+        return _section_markdown(section, section_num)
+    finally:
+        clear_caches()
+
+
+def _section_markdown(section: Tag, section_num: str) -> str:
+    """Body of process_section(); expects the hidden index to be built."""
     lines = []
     
     # Get title
@@ -281,7 +389,7 @@ def process_section(section: Tag, section_num: str) -> str:
     start_num = int(start_attr) if start_attr and start_attr.isdigit() else 1
     
     # Process top-level items
-    top_items = main_ol.find_all('li', recursive=False)
+    top_items = list_items(main_ol)
     item_counter = start_num
     
     for item in top_items:
@@ -289,35 +397,36 @@ def process_section(section: Tag, section_num: str) -> str:
         if is_hidden(item):
             continue
         
-        classes = item.get('class', [])
+        classes = item.get('class') or ()
         
         # Handle suppressed number items (like 1.00.xx intro section)
         if 'supress_number' in classes:
             nested_ol = item.find('ol', recursive=False)
             if nested_ol and not is_hidden(nested_ol):
-                nested_items = nested_ol.find_all('li', recursive=False)
+                nested_items = list_items(nested_ol)
                 for idx, nested_item in enumerate(nested_items):
                     # Skip hidden nested items
                     if is_hidden(nested_item):
                         continue
-                    is_intro = idx == 0 and 'intro' in nested_item.get('class', [])
+                    is_intro = idx == 0 and 'intro' in (nested_item.get('class') or ())
                     if section_num == "1":
                         # Special handling for 1.00.xx
-                        rule_lines = process_li(
+                        first_line = len(lines)
+                        process_li(
                             nested_item, section_num, "00", idx, [],
+                            out=lines,
                             is_intro=is_intro
                         )
                         # Fix numbering to be 1.00.00, 1.00.01, etc.
-                        for i, line in enumerate(rule_lines):
+                        for i in range(first_line, len(lines)):
+                            line = lines[i]
                             if line.startswith("1."):
                                 if idx == 0:
-                                    rule_lines[i] = re.sub(r'^1\.00\.\d+', '1.00.00', line)
+                                    lines[i] = _FIX_100_RE.sub('1.00.00', line)
                                 else:
-                                    rule_lines[i] = re.sub(r'^1\.00\.\d+', f'1.00.{idx:02d}', line)
-                        lines.extend(rule_lines)
+                                    lines[i] = _FIX_100_RE.sub(f'1.00.{idx:02d}', line)
                     else:
-                        rule_lines = process_li(nested_item, section_num, None, idx, [], is_intro=is_intro)
-                        lines.extend(rule_lines)
+                        process_li(nested_item, section_num, None, idx, [], out=lines, is_intro=is_intro)
             continue
         
         # Handle subsection headers
@@ -331,25 +440,17 @@ def process_section(section: Tag, section_num: str) -> str:
                 # Process nested list
                 nested_ol = item.find('ol', recursive=False)
                 if nested_ol and not is_hidden(nested_ol):
-                    nested_items = nested_ol.find_all('li', recursive=False)
+                    nested_items = list_items(nested_ol)
                     nested_counter = 0
                     # Check if first item is intro text that shouldn't be counted
                     first_item = nested_items[0] if nested_items else None
                     skip_first = False
                     if first_item:
-                        first_text = get_text_content(first_item, skip_links=True, exclude_nested_lists=True).lower()
+                        first_text = get_text_content(first_item, skip_links=True, exclude_nested_lists=True)
                         # Check if it's intro text (no anchor name, or contains phrases like "this section", "play at anytime")
                         anchor_with_name = first_item.find('a', {'name': True})
                         has_anchor_name = anchor_with_name is not None
-                        # Check for common intro patterns - be more lenient with matching
-                        is_intro_text = (
-                            'this section' in first_text or 
-                            'lists all' in first_text or 
-                            ('play at' in first_text and 'anytime' in first_text and ('options' in first_text or 'one of these' in first_text)) or
-                            ('on your' in first_text and 'action' in first_text and 'adhere' in first_text) or
-                            first_text.startswith('play at anytime')
-                        )
-                        if not has_anchor_name and is_intro_text:
+                        if not has_anchor_name and _is_intro_text(first_text):
                             # This is intro text, skip it from numbering
                             skip_first = True
                     
@@ -358,28 +459,29 @@ def process_section(section: Tag, section_num: str) -> str:
                         if is_hidden(nested_item):
                             continue
                         
-                        is_intro = 'intro' in nested_item.get('class', [])
+                        is_intro = 'intro' in (nested_item.get('class') or ())
                         if skip_first and idx == 0:
                             # Intro text items should be numbered as .00
-                            rule_lines = process_li(
+                            process_li(
                                 nested_item, section_num, subsection_num, 0, [],
+                                out=lines,
                                 is_intro=True  # Mark as intro so it gets .00
                             )
-                            lines.extend(rule_lines)
                             continue
                         elif is_intro:
                             # Intro items in subsections get .00
-                            rule_lines = process_li(
+                            process_li(
                                 nested_item, section_num, subsection_num, 0, [],
+                                out=lines,
                                 is_intro=True
                             )
                         else:
                             nested_counter += 1
-                            rule_lines = process_li(
+                            process_li(
                                 nested_item, section_num, subsection_num, nested_counter, [],
+                                out=lines,
                                 is_intro=False
                             )
-                        lines.extend(rule_lines)
             
             item_counter += 1
             continue
@@ -390,10 +492,9 @@ def process_section(section: Tag, section_num: str) -> str:
         # For other sections, check if it's the first item and has intro class
         if is_intro and section_num == "0" and item_counter == start_num:
             # This is 0.00
-            rule_lines = process_li(item, section_num, None, 0, [], is_intro=True)
+            process_li(item, section_num, None, 0, [], out=lines, is_intro=True)
         else:
-            rule_lines = process_li(item, section_num, None, item_counter, [], is_intro=is_intro)
-        lines.extend(rule_lines)
+            process_li(item, section_num, None, item_counter, [], out=lines, is_intro=is_intro)
         item_counter += 1
     
     return '\n'.join(lines)
@@ -409,6 +510,11 @@ def main():
         print("Install it with: pip install beautifulsoup4")
         return
     
+    # Pinned: lxml builds different trees for badly nested markup (e.g. an
+    # <ol> inside a <p>), which changes the generated rules. numbered_rules/
+    # was produced with html.parser.
+    parser = 'html.parser'
+    
     html_file = Path("/Users/ralf/Downloads/Landsraad of Las Vegas - Classic Rules.html")
     output_dir = Path("/Users/ralf/Documents/prj/exploration/coding/nextjs/dune-bench/numbered_rules")
     
@@ -418,23 +524,20 @@ def main():
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    print(f"Reading HTML file: {html_file}")
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    # Hand the raw bytes to the parser; it decodes them itself, which saves
+    # building a separate Python str of the whole document
+    print(f"Reading HTML file: {html_file} (parser: {parser})")
+    html_content = html_file.read_bytes()
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Only build the tree for the major sections; head, scripts and
+    # navigation are never looked at
+    only_sections = SoupStrainer('section', class_='page-break')
+    soup = BeautifulSoup(html_content, parser, parse_only=only_sections, from_encoding='utf-8')
+    del html_content
     
     # Find all major sections
     sections = soup.find_all('section', class_='page-break')
     
-    section_map = {
-        'setupgame': '0',
-        'phases': '1',
-        'factions': '2',
-        'treachery': '3',
-        'variants': '4'
-    }
-    
     for section in sections:
         section_id = section.get('id', '')
         data_listindex = section.get('data-listindex')
@@ -444,10 +547,9 @@ def main():
         if data_listindex is not None:
             section_num = str(data_listindex)
         else:
-            for key, num in section_map.items():
-                if key in section_id:
-                    section_num = num
-                    break
+            match = _SECTION_RE.search(section_id)
+            if match:
+                section_num = SECTION_MAP[match.group(0)]
         
         if not section_num:
             print(f"Skipping section with id: {section_id}")
@@ -458,8 +560,7 @@ def main():
         markdown = process_section(section, section_num)
         
         output_file = output_dir / f"{section_num}.md"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(markdown)
+        output_file.write_text(markdown, encoding='utf-8')
         
         print(f"  Written {len(markdown.splitlines())} lines to {output_file}")
     